@@ -1,11 +1,20 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
+import numpy as np
 import pandas as pd
 import pdfplumber
-import io
+import polars as pl
+import xlsxwriter
+import asyncio
+import hashlib
 import re
+import tempfile
+import threading
+from collections import OrderedDict, defaultdict
 from datetime import datetime
+from typing import BinaryIO
 
 from app.parser import parse_hdfc_pdf, parse_sbi_pdf, parse_axis_pdf
 from app.analyzer import analyze_emi
@@ -13,6 +22,9 @@ from app.analyzer import analyze_emi
 app = FastAPI(title="Bank Statement Analyzer V1")
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+RESULT_CACHE_SIZE = 32  # statements kept by process_statement_cached
+CHUNK_SIZE = 64 * 1024  # upload hashing / download streaming
+EXCEL_SPOOL_SIZE = 2 * 1024 * 1024  # larger workbooks spill to disk
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,19 +41,20 @@ app.add_middleware(
 
 
 def extract_account_info(
-    contents: bytes, bank: str, password: str | None = None
+    file_stream: BinaryIO, bank: str, password: str | None = None
 ) -> dict:
     """
     Extract account holder metadata from the first page of the PDF.
     Returns a unified dict for both HDFC and SBI statements.
     """
-    with pdfplumber.open(io.BytesIO(contents), password=password) as pdf:
+    file_stream.seek(0)
+    with pdfplumber.open(file_stream, password=password) as pdf:
         raw_text = pdf.pages[0].extract_text() or ""
         words = pdf.pages[0].extract_words()
 
-    rows = {}
+    rows = defaultdict(list)
     for w in words:
-        rows.setdefault(round(w["top"], 0), []).append(w)
+        rows[round(w["top"], 0)].append(w)
 
     # ── HDFC ──────────────────────────────────────────────────────────────────
     if bank == "hdfc":
@@ -416,47 +429,77 @@ def classify_account_type(df: pd.DataFrame) -> dict:
 # -------------------------------
 
 
-def generate_summary(df):
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    total_income = df["credit"].sum()
-    total_expense = df["debit"].sum()
-    net_flow = total_income - total_expense
-
-    daily = df.sort_values("date").groupby(df["date"].dt.date)["balance"].last()
-    avg_balance = daily.mean()
+def generate_summaries(df):
+    """
+    Statement-level summary and per-month totals, computed by one lazy
+    Polars query over a date-sorted transactions frame.
 
-    credit_df = df[df["credit"] > 0]
-    debit_df = df[df["debit"] > 0]
+    Returns (summary, monthly_summary); monthly_summary stays a pandas
+    DataFrame [month, credit, debit, net] for the JSON / Excel layers.
+    """
+    lf = pl.DataFrame(
+        {
+            "date": df["date"].to_numpy(),
+            "credit": df["credit"].to_numpy(),
+            "debit": df["debit"].to_numpy(),
+            "balance": df["balance"].to_numpy(),
+        }
+    ).lazy()
+
+    monthly_q = (
+        lf.group_by(pl.col("date").dt.truncate("1mo").alias("month"))
+        .agg(pl.col("credit").sum(), pl.col("debit").sum())
+        .sort("month")
+        .with_columns(
+            pl.col("month").dt.strftime("%Y-%m"),
+            (pl.col("credit") - pl.col("debit")).alias("net"),
+        )
+    )
+    # End-of-day balance (last row of each day), averaged over days
+    avg_balance_q = (
+        lf.group_by(pl.col("date").dt.truncate("1d"))
+        .agg(pl.col("balance").last())
+        .select(pl.col("balance").mean().alias("avg_balance"))
+    )
+    stats_q = lf.select(
+        pl.col("balance").max().alias("max_balance"),
+        pl.col("balance").min().alias("min_balance"),
+        pl.col("credit").filter(pl.col("credit") > 0).max().alias("max_credit"),
+        pl.col("credit").filter(pl.col("credit") > 0).min().alias("min_credit"),
+        pl.col("debit").filter(pl.col("debit") > 0).max().alias("max_debit"),
+        pl.col("debit").filter(pl.col("debit") > 0).min().alias("min_debit"),
+    )
+    monthly, avg_balance, stats = pl.collect_all([monthly_q, avg_balance_q, stats_q])
 
-    max_balance = df["balance"].max()
-    min_balance = df["balance"].min()
-    max_credit = credit_df["credit"].max() if not credit_df.empty else 0
-    min_credit = credit_df["credit"].min() if not credit_df.empty else 0
-    max_debit = debit_df["debit"].max() if not debit_df.empty else 0
-    min_debit = debit_df["debit"].min() if not debit_df.empty else 0
+    # Income/expense are folded from the monthly sums, not re-scanned
+    total_income = monthly["credit"].sum()
+    total_expense = monthly["debit"].sum()
+    net_flow = total_income - total_expense
 
-    return {
-        "total_income": round(total_income, 2),
-        "total_expense": round(total_expense, 2),
-        "net_flow": round(net_flow, 2),
-        "avg_balance": round(avg_balance, 2),
-        "max_credit": round(max_credit, 2),
-        "min_credit": round(min_credit, 2),
-        "max_debit": round(max_debit, 2),
-        "min_debit": round(min_debit, 2),
-        "max_balance": round(max_balance, 2),
-        "min_balance": round(min_balance, 2),
-        "largest_transaction": round(max(max_credit, max_debit), 2),
+    stats = stats.row(0, named=True)
+    max_credit = stats["max_credit"] or 0
+    min_credit = stats["min_credit"] or 0
+    max_debit = stats["max_debit"] or 0
+    min_debit = stats["min_debit"] or 0
+
+    summary = {
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "net_flow": net_flow,
+        "avg_balance": avg_balance.item(),
+        "max_credit": max_credit,
+        "min_credit": min_credit,
+        "max_debit": max_debit,
+        "min_debit": min_debit,
+        "max_balance": stats["max_balance"],
+        "min_balance": stats["min_balance"],
+        "largest_transaction": max(max_credit, max_debit),
     }
 
-
-def generate_monthly_summary(df):
+    # Kept for the Excel export, whose Transactions sheet lists the month
     df["month"] = df["date"].dt.to_period("M")
-    monthly = df.groupby("month").agg({"credit": "sum", "debit": "sum"}).reset_index()
-    monthly["net"] = monthly["credit"] - monthly["debit"]
-    monthly["month"] = monthly["month"].astype(str)
-    return monthly
+
+    return summary, pd.DataFrame(monthly.to_dict(as_series=False))
 
 
 # -------------------------------
@@ -464,55 +507,68 @@ def generate_monthly_summary(df):
 # -------------------------------
 
 
+# Tier tables: the first matching condition picks its score, the last score
+# is the fallback when none match.
+_SURPLUS_THRESHOLDS = np.asarray([0.25, 0.0])  # surplus above x * avg income
+_SURPLUS_SCORES = np.asarray([40, 25, 5])  # out of 40
+_STABILITY_THRESHOLDS = np.asarray([0.25, 0.5])  # income variation below x
+_STABILITY_SCORES = np.asarray([30, 15, 5])  # out of 30
+_BALANCE_THRESHOLDS = np.asarray([1.0, 0.5])  # closing above x * avg expense
+_BALANCE_SCORES = np.asarray([30, 15, 5])  # out of 30
+_RATING_THRESHOLDS = np.asarray([80, 60, 40])  # total score at least x
+_RATINGS = np.asarray(["Strong", "Moderate", "Risky", "High Risk"])
+
+
+def _tier(conditions, choices):
+    return np.select(conditions, choices[:-1], default=choices[-1])
+
+
+def score_loan_readiness(avg_income, avg_expense, variation, closing_balance):
+    """
+    Branch-free loan score. Every argument may be a scalar or an array
+    (one entry per account); returns (total_score, rating) shaped alike.
+    """
+    avg_income = np.asarray(avg_income, dtype=np.float64)
+    avg_expense = np.asarray(avg_expense, dtype=np.float64)
+    variation = np.asarray(variation, dtype=np.float64)
+    closing_balance = np.asarray(closing_balance, dtype=np.float64)
+    surplus = avg_income - avg_expense
+
+    surplus_score = _tier(
+        [surplus > avg_income * t for t in _SURPLUS_THRESHOLDS], _SURPLUS_SCORES
+    )
+    stability_score = _tier(
+        [variation < t for t in _STABILITY_THRESHOLDS], _STABILITY_SCORES
+    )
+    balance_score = _tier(
+        [closing_balance > avg_expense * t for t in _BALANCE_THRESHOLDS],
+        _BALANCE_SCORES,
+    )
+
+    total_score = surplus_score + stability_score + balance_score
+    rating = _tier([total_score >= t for t in _RATING_THRESHOLDS], _RATINGS)
+    return total_score, rating
+
+
 def generate_loan_readiness(summary, monthly_summary):
     months = len(monthly_summary)
     avg_income = monthly_summary["credit"].mean() if months else 0
     avg_expense = monthly_summary["debit"].mean() if months else 0
     surplus = avg_income - avg_expense
-
-    # Surplus Score (40)
-    if surplus > avg_income * 0.25:
-        surplus_score = 40
-    elif surplus > 0:
-        surplus_score = 25
-    else:
-        surplus_score = 5
-
-    # Income Stability (30)
     variation = monthly_summary["credit"].std() / avg_income if avg_income else 1
-    if variation < 0.25:
-        stability_score = 30
-    elif variation < 0.5:
-        stability_score = 15
-    else:
-        stability_score = 5
-
-    # Balance Health (30)
-    closing_balance = summary["closing_balance"]
-    if closing_balance > avg_expense:
-        balance_score = 30
-    elif closing_balance > avg_expense * 0.5:
-        balance_score = 15
-    else:
-        balance_score = 5
-
-    total_score = surplus_score + stability_score + balance_score
 
-    if total_score >= 80:
-        rating = "Strong"
-    elif total_score >= 60:
-        rating = "Moderate"
-    elif total_score >= 40:
-        rating = "Risky"
-    else:
-        rating = "High Risk"
+    total_score, rating = score_loan_readiness(
+        avg_income, avg_expense, variation, summary["closing_balance"]
+    )
+    total_score = total_score.tolist()
+    rating = rating.tolist()
 
     return {
-        "loan_score": round(total_score, 2),
+        "loan_score": total_score,
         "rating": rating,
-        "avg_monthly_income": round(avg_income, 2),
-        "avg_monthly_expense": round(avg_expense, 2),
-        "monthly_surplus": round(surplus, 2),
+        "avg_monthly_income": avg_income,
+        "avg_monthly_expense": avg_expense,
+        "monthly_surplus": surplus,
     }
 
 
@@ -521,9 +577,10 @@ def generate_loan_readiness(summary, monthly_summary):
 # -------------------------------
 
 
-def detect_bank(contents: bytes, password: str | None = None) -> str:
+def detect_bank(file_stream: BinaryIO, password: str | None = None) -> str:
     try:
-        with pdfplumber.open(io.BytesIO(contents), password=password) as pdf:
+        file_stream.seek(0)
+        with pdfplumber.open(file_stream, password=password) as pdf:
             first_page_text = pdf.pages[0].extract_text() or ""
     except Exception:
         raise HTTPException(status_code=401, detail={"error": "PASSWORD_REQUIRED"})
@@ -548,40 +605,41 @@ def detect_bank(contents: bytes, password: str | None = None) -> str:
 # -------------------------------
 
 
-def process_statement(contents: bytes, password: str | None = None):
-    bank = detect_bank(contents, password)
+def process_statement(file_stream: BinaryIO, password: str | None = None):
+    bank = detect_bank(file_stream, password)
 
+    file_stream.seek(0)
     if bank == "sbi":
-        df = parse_sbi_pdf(io.BytesIO(contents), password)
+        df = parse_sbi_pdf(file_stream, password)
     elif bank == "axis":
-        df = parse_axis_pdf(io.BytesIO(contents), password)
+        df = parse_axis_pdf(file_stream, password)
     else:
-        df = parse_hdfc_pdf(io.BytesIO(contents), password)
+        df = parse_hdfc_pdf(file_stream, password)
 
     if df.empty:
         raise HTTPException(400, "No transactions detected.")
 
-    df = df.sort_values(["date"]).reset_index(drop=True)
+    if not df.attrs.get("sorted"):
+        df = df.sort_values(["date"]).reset_index(drop=True)
 
-    first = df.iloc[0]
-    last = df.iloc[-1]
-    credit = float(first.get("credit", 0) or 0)
-    debit = float(first.get("debit", 0) or 0)
-    balance = float(first["balance"])
+    # Scalars straight from the column arrays — no row Series needed
+    credit = df["credit"].to_numpy()
+    debit = df["debit"].to_numpy()
+    balance = df["balance"].to_numpy()
 
-    opening_balance = balance - credit if credit > 0 else balance + debit
-    closing_balance = float(last["balance"])
+    c0, d0, b0 = float(credit[0]), float(debit[0]), float(balance[0])
+    opening_balance = b0 - c0 if c0 > 0 else b0 + d0
+    closing_balance = float(balance[-1])
 
-    account_info = extract_account_info(contents, bank, password)
+    account_info = extract_account_info(file_stream, bank, password)
     _classification = classify_account_type(df)
     account_info["account_category"] = _classification["category"]
     account_info["account_type_signals"] = _classification["signals"]
     account_info["account_type_scores"] = _classification["scores"]
-    summary = generate_summary(df)
-    monthly_summary = generate_monthly_summary(df)
+    summary, monthly_summary = generate_summaries(df)
 
-    summary["opening_balance"] = round(opening_balance, 2)
-    summary["closing_balance"] = round(closing_balance, 2)
+    summary["opening_balance"] = opening_balance
+    summary["closing_balance"] = closing_balance
 
     loan_metrics = generate_loan_readiness(summary, monthly_summary)
 
@@ -589,23 +647,92 @@ def process_statement(contents: bytes, password: str | None = None):
     return df, summary, monthly_summary, loan_metrics, account_info, emi_analysis
 
 
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()  # endpoints call in from worker threads
+
+
+def process_statement_cached(
+    digest: bytes, file_stream: BinaryIO, password: str | None = None
+):
+    """
+    process_statement memoised on the _hash_upload digest of the file and
+    password, so that /analyze followed by /download-excel on the same PDF
+    parses it once. Cached results are shared: callers must not mutate
+    them in place.
+    """
+    with _result_cache_lock:
+        if digest in _result_cache:
+            _result_cache.move_to_end(digest)
+            return _result_cache[digest]
+
+    result = process_statement(file_stream, password)
+
+    with _result_cache_lock:
+        _result_cache[digest] = result
+        if len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return result
+
+
+async def _hash_upload(
+    file: UploadFile, password: str | None = None, limit: int = MAX_FILE_SIZE
+) -> bytes:
+    """
+    Read the (already spooled) upload in chunks to enforce the size limit
+    and compute its blake2b digest, then rewind it so `file.file` can be
+    handed to the parsers without ever holding the whole PDF in memory.
+
+    The password is folded into the digest, so a cached result is never
+    served for a wrong password and the plaintext is never kept as a key.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    size = 0
+    while chunk := await file.read(CHUNK_SIZE):
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(400, "File too large.")
+        h.update(chunk)
+    await file.seek(0)
+
+    # Fixed-size content digest first, so file bytes and password cannot
+    # run into each other
+    key = hashlib.blake2b(h.digest(), digest_size=16)
+    key.update((password or "").encode())
+    return key.digest()
+
+
 # -------------------------------
 # 📊 ANALYZE API
 # -------------------------------
 
 
+def _round2(d: dict) -> dict:
+    """
+    Round a metrics dict's floats to 2dp. The aggregation functions keep
+    full precision; rounding happens once here, at the response boundary.
+    """
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in d.items()}
+
+
+def _round2_monthly(monthly_summary: pd.DataFrame) -> pd.DataFrame:
+    """_round2 for the monthly credit/debit/net sums; returns a new frame."""
+    return monthly_summary.round({"credit": 2, "debit": 2, "net": 2})
+
+
 @app.post("/analyze")
 async def analyze(file: UploadFile = File(...), password: str = Form(None)):
     if file.content_type != "application/pdf":
         raise HTTPException(400, "Only PDF allowed.")
 
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(400, "File too large.")
+    digest = await _hash_upload(file, password)
 
+    # PDF parsing + pandas work is CPU-bound: keep it off the event loop
     df, summary, monthly_summary, loan_metrics, account_info, emi_analysis = (
-        process_statement(contents, password)
+        await asyncio.to_thread(process_statement_cached, digest, file.file, password)
     )
+    summary = _round2(summary)  # new dict — the cached one stays untouched
+    loan_metrics = _round2(loan_metrics)
+    monthly_summary = _round2_monthly(monthly_summary)
 
     if not monthly_summary.empty:
         summary["highest_income_month"] = monthly_summary.loc[
@@ -634,41 +761,121 @@ async def analyze(file: UploadFile = File(...), password: str = Form(None)):
 # 📥 DOWNLOAD EXCEL API
 # -------------------------------
 
+# constant_memory flushes each row to a temp file as soon as the next row is
+# started, so peak memory no longer grows with the transaction count. Cells
+# must therefore be written strictly row by row; pandas' to_excel writes
+# column by column, hence _write_sheet below.
+_EXCEL_OPTIONS = {
+    "constant_memory": True,
+    "strings_to_numbers": False,
+    "default_date_format": "dd-mm-yyyy",
+}
+
+# Same look as the header row pandas' to_excel produces
+_EXCEL_HEADER_FORMAT = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+
+
+def _excel_value(v):
+    """Coerce a cell value into a type xlsxwriter writes natively."""
+    if isinstance(v, (list, dict, pd.Period)):
+        return str(v)
+    if pd.isna(v):
+        return None  # blank cell, as pandas writes NaN/NaT
+    return v
+
+
+def _write_sheet(workbook, header_format, name, columns, rows):
+    worksheet = workbook.add_worksheet(name)
+    worksheet.write_row(0, 0, columns, header_format)
+    for r, row in enumerate(rows, start=1):
+        worksheet.write_row(r, 0, [_excel_value(v) for v in row])
+
+
+def _build_workbook(
+    df, summary, monthly_summary, loan_metrics, account_info, emi_analysis
+):
+    """Write the analysis workbook into a spooled file, rewound for reading."""
+    # Spooled: small workbooks stay in memory, big ones go to a temp file
+    # instead of growing one large in-memory buffer per request
+    output = tempfile.SpooledTemporaryFile(max_size=EXCEL_SPOOL_SIZE)
+    # The endpoint's BackgroundTask only closes the spool once a response
+    # exists; close it here if building the workbook fails
+    try:
+        with xlsxwriter.Workbook(output, _EXCEL_OPTIONS) as workbook:
+            header = workbook.add_format(_EXCEL_HEADER_FORMAT)
+
+            _write_sheet(
+                workbook,
+                header,
+                "Transactions",
+                df.columns.tolist(),
+                df.itertuples(index=False, name=None),
+            )
+            _write_sheet(
+                workbook,
+                header,
+                "Account Info",
+                ["Field", "Value"],
+                account_info.items(),
+            )
+            _write_sheet(
+                workbook, header, "Summary", ["Metric", "Value"], summary.items()
+            )
+            _write_sheet(
+                workbook,
+                header,
+                "Monthly",
+                monthly_summary.columns.tolist(),
+                monthly_summary.itertuples(index=False, name=None),
+            )
+            _write_sheet(
+                workbook,
+                header,
+                "Loan Analysis",
+                ["Metric", "Value"],
+                loan_metrics.items(),
+            )
+            _write_sheet(
+                workbook,
+                header,
+                "EMI Analysis",
+                ["Metric", "Value"],
+                emi_analysis["emi_summary"].items(),
+            )
+
+        output.seek(0)
+    except BaseException:
+        output.close()
+        raise
+
+    return output
+
 
 @app.post("/download-excel")
 async def download_excel(file: UploadFile = File(...), password: str = Form(None)):
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(400, "File too large.")
+    digest = await _hash_upload(file, password)
 
     df, summary, monthly_summary, loan_metrics, account_info, emi_analysis = (
-        process_statement(contents, password)
+        await asyncio.to_thread(process_statement_cached, digest, file.file, password)
+    )
+    summary = _round2(summary)
+    loan_metrics = _round2(loan_metrics)
+    monthly_summary = _round2_monthly(monthly_summary)
+
+    # Per-cell writes and spool spills are blocking: keep them off the loop
+    output = await asyncio.to_thread(
+        _build_workbook,
+        df,
+        summary,
+        monthly_summary,
+        loan_metrics,
+        account_info,
+        emi_analysis,
     )
 
-    df_export = df.copy()
-    df_export["date"] = df_export["date"].dt.strftime("%d-%m-%Y")
-
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df_export.to_excel(writer, index=False, sheet_name="Transactions")
-
-        pd.DataFrame(account_info.items(), columns=["Field", "Value"]).to_excel(
-            writer, index=False, sheet_name="Account Info"
-        )
-        pd.DataFrame(summary.items(), columns=["Metric", "Value"]).to_excel(
-            writer, index=False, sheet_name="Summary"
-        )
-        monthly_summary.to_excel(writer, index=False, sheet_name="Monthly")
-        pd.DataFrame(loan_metrics.items(), columns=["Metric", "Value"]).to_excel(
-            writer, index=False, sheet_name="Loan Analysis"
-        )
-        pd.DataFrame(
-            emi_analysis["emi_summary"].items(), columns=["Metric", "Value"]
-        ).to_excel(writer, index=False, sheet_name="EMI Analysis")
-
-    output.seek(0)
     return StreamingResponse(
-        output,
+        iter(lambda: output.read(CHUNK_SIZE), b""),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": "attachment; filename=analysis.xlsx"},
+        background=BackgroundTask(output.close),
     )
@@ -1,7 +1,16 @@
 from fastapi import HTTPException
 import pdfplumber
+import re
+import numpy as np
 import pandas as pd
+from collections import defaultdict
 from datetime import datetime
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LAParams, LTChar, LTFigure, LTTextContainer
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
 
 
 # ---------------------------------------------------------------------------
@@ -25,14 +34,36 @@ _H_VALDT_END = 401
 _H_WITHDRAWAL_END = 490
 _H_DEPOSIT_END = 561
 
+_H_BOUNDS = np.array(
+    [
+        _H_DATE_END,
+        _H_NARR_END,
+        _H_REF_END,
+        _H_VALDT_END,
+        _H_WITHDRAWAL_END,
+        _H_DEPOSIT_END,
+    ],
+    dtype=np.float64,
+)
+
+# Column ids as produced by np.digitize(x0, _H_BOUNDS)
+(
+    _H_COL_DATE,
+    _H_COL_NARR,
+    _H_COL_REF,
+    _H_COL_VALDT,
+    _H_COL_WITHDRAWAL,
+    _H_COL_DEPOSIT,
+    _H_COL_BALANCE,
+) = range(len(_H_BOUNDS) + 1)
+
+
+_H_DATE_RE = re.compile(r"\d{2}/\d{2}/\d{2}").match
+
 
 def _hdfc_is_date(text):
     """True if text looks like an HDFC date: dd/mm/yy."""
-    try:
-        datetime.strptime(text, "%d/%m/%y")
-        return True
-    except ValueError:
-        return False
+    return len(text) == 8 and _H_DATE_RE(text) is not None
 
 
 def _hdfc_amt(text):
@@ -43,13 +74,240 @@ def _hdfc_amt(text):
         return None
 
 
+def _hdfc_row_amounts(texts, row_ids, col_ids, n_rows):
+    """
+    Withdrawal / deposit / balance per row for one page; 0.0 where a row
+    has none. Inputs must be ordered by row, then x, so the right-most
+    amount in a column wins.
+    """
+    out = np.zeros((n_rows, 3))
+    mask = col_ids >= _H_COL_WITHDRAWAL
+    for t, r, c in zip(
+        texts[mask].tolist(),
+        row_ids[mask].tolist(),
+        (col_ids[mask] - _H_COL_WITHDRAWAL).tolist(),
+    ):
+        v = _hdfc_amt(t)
+        if v is not None:
+            out[r, c] = v
+    return out
+
+
+# Same gap pdfplumber's extract_words() uses to split words (x_tolerance)
+_H_WORD_GAP = 3
+
+# Column calibration: the verified layout's dates start at x0 = 33. Pages
+# whose header "Date" sits further away than the dead-band shift every
+# boundary by that offset, provided the page's own date and amount tokens
+# agree (see _hdfc_shift_fits); closer ones keep the verified boundaries.
+_H_DATE_X0 = 33
+_H_SHIFT_DEADBAND = 5
+
+# all_texts: also group text drawn inside Form XObjects (LTFigure), which
+# pdfplumber's page.chars includes.
+# boxes_flow=None: skip pdfminer's hierarchical text-box clustering; only
+# text-line membership is used, rows and columns are binned here.
+_H_LAPARAMS = LAParams(char_margin=1.5, all_texts=True, boxes_flow=None)
+
+
+def _hdfc_text_lines(container):
+    """Text lines of a layout container, descending into figures."""
+    for box in container:
+        if isinstance(box, LTFigure):
+            yield from _hdfc_text_lines(box)
+        elif isinstance(box, LTTextContainer):
+            for line in box:
+                if isinstance(line, LTTextContainer):
+                    yield line
+
+
+def _hdfc_page_chars(layout):
+    """
+    Flatten a pdfminer LTPage's text lines into per-char arrays, collected
+    once per page: (texts, x0s, x1s, tops, line_ids). `top` is measured
+    from the top of the page, like pdfplumber.
+    """
+    texts, x0s, x1s, tops, line_ids = [], [], [], [], []
+    page_top = layout.y1
+
+    for line_no, line in enumerate(_hdfc_text_lines(layout)):
+        for ch in line:
+            if isinstance(ch, LTChar):  # LTAnno: virtual space, skipped
+                texts.append(ch.get_text())
+                x0s.append(ch.x0)
+                x1s.append(ch.x1)
+                tops.append(page_top - ch.y1)
+                line_ids.append(line_no)
+
+    return (
+        np.array(texts, dtype=object),
+        np.asarray(x0s, dtype=np.float64),
+        np.asarray(x1s, dtype=np.float64),
+        np.asarray(tops, dtype=np.float64),
+        np.asarray(line_ids, dtype=np.int64),
+    )
+
+
+def _hdfc_page_words(texts, x0s, x1s, tops, line_ids):
+    """
+    Group a page's chars (see _hdfc_page_chars) into words in one
+    vectorised pass. A word ends at whitespace, at the end of a text line
+    and at horizontal gaps wider than _H_WORD_GAP.
+
+    Returns three parallel sequences (texts, x0s, tops) of words.
+    """
+    if not texts.size:
+        return [], [], []
+
+    space = np.fromiter((t.isspace() for t in texts), dtype=bool, count=texts.size)
+    starts_word = np.ones(texts.size, dtype=bool)
+    starts_word[1:] = (
+        (line_ids[1:] != line_ids[:-1])
+        | space[:-1]
+        | (x0s[1:] - x1s[:-1] > _H_WORD_GAP)
+    )
+
+    keep = ~space
+    word_ids = np.cumsum(starts_word)[keep]
+    if not word_ids.size:
+        return [], [], []
+    firsts = np.flatnonzero(np.r_[True, word_ids[1:] != word_ids[:-1]])
+
+    return (
+        np.add.reduceat(texts[keep], firsts).tolist(),
+        x0s[keep][firsts],
+        np.minimum.reduceat(tops[keep], firsts),
+    )
+
+
+def _hdfc_shift_fits(texts, x0s, shift):
+    """
+    Check a learned column offset against the page's data rows:
+      - its dd/mm/yy tokens (transaction and value dates) must land in the
+        Date / Value Dt columns at least as often as with the verified
+        boundaries;
+      - no amount token in the amount zone may change column, so a wrong
+        offset can never move money between withdrawal, deposit and
+        balance.
+    Returns None if the page has no date tokens to check against.
+    """
+    is_date = np.fromiter(
+        (_hdfc_is_date(t) for t in texts), dtype=bool, count=len(texts)
+    )
+    if not is_date.any():
+        return None
+
+    x0s = np.asarray(x0s, dtype=np.float64)
+    shifted = _H_BOUNDS + shift
+
+    def fits(bounds):
+        cols = np.digitize(x0s[is_date], bounds)
+        return np.count_nonzero((cols == _H_COL_DATE) | (cols == _H_COL_VALDT))
+
+    if fits(shifted) < fits(_H_BOUNDS):
+        return False
+
+    is_amt = np.fromiter(
+        (_hdfc_amt(t) is not None for t in texts), dtype=bool, count=len(texts)
+    )
+    verified_cols = np.digitize(x0s[is_amt], _H_BOUNDS)
+    shifted_cols = np.digitize(x0s[is_amt], shifted)
+    in_amount_zone = (verified_cols >= _H_COL_WITHDRAWAL) | (
+        shifted_cols >= _H_COL_WITHDRAWAL
+    )
+    return not (verified_cols != shifted_cols)[in_amount_zone].any()
+
+
+def _hdfc_header_shift(texts, x0s, tops):
+    """
+    Horizontal offset of this page's columns from the verified layout,
+    learned from the x0 of "Date" on the "Date Narration ..." header row.
+    Offsets inside _H_SHIFT_DEADBAND, or that the page's data rows
+    disagree with, are treated as 0. Returns None if the page has no such
+    header row, or no date tokens to confirm the offset with.
+    """
+    if not texts:
+        return None
+
+    texts = np.asarray(texts, dtype=object)
+    rows = np.round(np.asarray(tops, dtype=np.float64))
+    narration_rows = rows[texts == "Narration"]
+
+    for i in np.flatnonzero(texts == "Date"):
+        if (narration_rows == rows[i]).any():
+            shift = float(x0s[i]) - _H_DATE_X0
+            if abs(shift) < _H_SHIFT_DEADBAND:
+                return 0.0
+            fits = _hdfc_shift_fits(texts, x0s, shift)
+            if fits is None:
+                return None
+            return shift if fits else 0.0
+    return None
+
+
+def _hdfc_open(file_stream, password):
+    """Open a PDF with pdfminer → (interpreter, device, pages)."""
+    doc = PDFDocument(PDFParser(file_stream), password=password or "")
+    rsrcmgr = PDFResourceManager()
+    device = PDFPageAggregator(rsrcmgr, laparams=_H_LAPARAMS)
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+    return interpreter, device, list(PDFPage.create_pages(doc))
+
+
+def _hdfc_layout_pages(interpreter, device, pages):
+    """
+    Lay out each page in turn and extract its words, yielding
+    ((width, height), (texts, x0s, tops)) per page, in page order.
+    """
+    for page in pages:
+        interpreter.process_page(page)
+        layout = device.get_result()
+        yield (layout.width, layout.height), _hdfc_page_words(*_hdfc_page_chars(layout))
+
+
+def _hdfc_rows(texts, x0s, tops, bounds=_H_BOUNDS):
+    """
+    Group a page's words into logical rows by rounded y-position and bin
+    each word into an HDFC column, all in one vectorised pass.
+
+    Yields (texts, x0s, cols, amounts) per row, rows top-to-bottom and
+    words left-to-right; amounts is (withdrawal, deposit, balance).
+    """
+    if not texts:
+        return
+
+    tops = np.asarray(tops, dtype=np.float64)
+    x0s = np.asarray(x0s, dtype=np.float64)
+    texts = np.array(texts, dtype=object)
+
+    row_ids = np.unique(np.round(tops), return_inverse=True)[1]
+    col_ids = np.digitize(x0s, bounds)
+
+    order = np.lexsort((x0s, row_ids))
+    texts = texts[order]
+    x0s = x0s[order]
+    row_ids = row_ids[order]
+    col_ids = col_ids[order]
+    splits = np.flatnonzero(np.diff(row_ids)) + 1
+
+    amounts = _hdfc_row_amounts(texts, row_ids, col_ids, len(splits) + 1)
+
+    for t, x, c, a in zip(
+        np.split(texts, splits),
+        np.split(x0s, splits),
+        np.split(col_ids, splits),
+        amounts.tolist(),
+    ):
+        yield t.tolist(), x.tolist(), c.tolist(), a
+
+
 def _hdfc_is_header(texts):
     return texts[0] in ("Date", "Narration", "Statementof")
 
 
-def _hdfc_is_footer(x0s):
+def _hdfc_is_footer(x0s, shift=0.0):
     """Footer rows start at x < 30 (bank disclaimer text)."""
-    return x0s[0] < 30
+    return x0s[0] < 30 + shift
 
 
 def parse_hdfc_pdf(file_stream, password=None):
@@ -62,98 +320,93 @@ def parse_hdfc_pdf(file_stream, password=None):
       Cont rows:  narration-part-2   (x=72, no date, no amounts)
                   narration-part-3   ...
     """
-    transactions = []
+    # Column-wise accumulators, one entry per transaction
+    dates = []
+    narrations = []
+    ref_nos = []
+    value_dates = []
+    debits = []
+    credits = []
+    balances = []
 
     try:
-        pdf = pdfplumber.open(file_stream, password=password)
+        interpreter, device, pages = _hdfc_open(file_stream, password)
     except Exception:
         raise HTTPException(status_code=401, detail={"error": "PASSWORD_REQUIRED"})
 
-    with pdf:
-        for page in pdf.pages:
-            words = page.extract_words()
-
-            # Group words by y-position into logical rows
-            rows = {}
-            for w in words:
-                rows.setdefault(round(w["top"], 0), []).append(w)
-
-            for _top, row_words in sorted(rows.items()):
-                row_words = sorted(row_words, key=lambda w: w["x0"])
-                texts = [w["text"] for w in row_words]
-                x0s = [w["x0"] for w in row_words]
-
-                # ── Skip headers and footers ────────────────────────────────
-                if _hdfc_is_header(texts) or _hdfc_is_footer(x0s):
-                    continue
-
-                # ── New transaction: first word is a date ───────────────────
-                if x0s[0] < _H_DATE_END and _hdfc_is_date(texts[0]):
-                    narration = ""
-                    ref_no = ""
-                    value_date = ""
-                    debit = 0.0
-                    credit = 0.0
-                    balance = 0.0
-
-                    try:
-                        txn_date = datetime.strptime(texts[0], "%d/%m/%y")
-                    except ValueError:
-                        continue
-
-                    for w in row_words[1:]:  # skip the date token itself
-                        x, t = w["x0"], w["text"]
-                        if x < _H_NARR_END:
-                            narration += t + " "
-                        elif x < _H_REF_END:
-                            ref_no += t + " "
-                        elif x < _H_VALDT_END:
-                            value_date += t + " "
-                        elif x < _H_WITHDRAWAL_END:
-                            v = _hdfc_amt(t)
-                            if v is not None:
-                                debit = v
-                        elif x < _H_DEPOSIT_END:
-                            v = _hdfc_amt(t)
-                            if v is not None:
-                                credit = v
-                        else:
-                            v = _hdfc_amt(t)
-                            if v is not None:
-                                balance = v
-
-                    transactions.append(
-                        {
-                            "date": txn_date,
-                            "narration": narration.strip(),
-                            "ref_no": ref_no.strip(),
-                            "value_date": value_date.strip(),
-                            "debit": debit,
-                            "credit": credit,
-                            "balance": balance,
-                        }
-                    )
-                    continue
-
-                # ── Continuation row: no date, no amounts ───────────────────
-                # All words must be in the narration zone (x < ref boundary)
-                # and there must be no amount-zone words
-                if not transactions:
-                    continue
-
-                has_amounts = any(x >= _H_REF_END for x in x0s)
-                if has_amounts:
-                    continue  # has ref/amount cols → not a narration continuation
-
-                # Append all words to narration of last transaction
-                for w in row_words:
-                    x, t = w["x0"], w["text"]
-                    if x < _H_NARR_END:
-                        transactions[-1]["narration"] += " " + t
-
-                transactions[-1]["narration"] = transactions[-1]["narration"].strip()
-
-    df = pd.DataFrame(transactions)
+    # Column offsets learned per page size; pages without a header row
+    # reuse the one learned from an earlier page of the same size
+    learned_shifts = {}
+
+    # Rows are stitched across pages because a narration can continue at
+    # the top of the next page.
+    for size, words in _hdfc_layout_pages(interpreter, device, pages):
+        shift = _hdfc_header_shift(*words)
+        if shift is None:
+            shift = learned_shifts.get(size, 0.0)
+        else:
+            learned_shifts.setdefault(size, shift)
+        bounds = _H_BOUNDS + shift
+
+        for texts, x0s, cols, amounts in _hdfc_rows(*words, bounds):
+
+            # ── Skip headers and footers ────────────────────────────────────
+            if _hdfc_is_header(texts) or _hdfc_is_footer(x0s, shift):
+                continue
+
+            # ── New transaction: first word is a date ───────────────────────
+            if x0s[0] < bounds[0] and _hdfc_is_date(texts[0]):
+                # Bucket every token after the date by its column id
+                fields = [[] for _ in range(len(_H_BOUNDS) + 1)]
+                for t, c in zip(texts[1:], cols[1:]):
+                    fields[c].append(t)
+
+                dates.append(texts[0])  # converted in bulk below
+                narrations.append(" ".join(fields[_H_COL_DATE] + fields[_H_COL_NARR]))
+                ref_nos.append(" ".join(fields[_H_COL_REF]))
+                value_dates.append(" ".join(fields[_H_COL_VALDT]))
+                debit, credit, balance = amounts
+                debits.append(debit)
+                credits.append(credit)
+                balances.append(balance)
+                continue
+
+            # ── Continuation row: no date, no amounts ───────────────────────
+            # All words must be in the narration zone (x < ref boundary)
+            # and there must be no amount-zone words
+            if not dates:
+                continue
+
+            if max(cols) >= _H_COL_VALDT:
+                continue  # has ref/amount cols → not a narration continuation
+
+            # Append all narration-zone words to the last transaction
+            parts = [t for t, c in zip(texts, cols) if c <= _H_COL_NARR]
+            narrations[-1] = " ".join([narrations[-1], *parts]).strip()
+
+    # One vectorised conversion for all rows; cache=True parses each distinct
+    # day once. Pattern-valid but impossible dates (31/02/24) become NaT.
+    columns = {
+        "date": pd.to_datetime(dates, format="%d/%m/%y", errors="coerce", cache=True),
+        "narration": np.asarray(narrations, dtype=object),
+        "ref_no": np.asarray(ref_nos, dtype=object),
+        "value_date": np.asarray(value_dates, dtype=object),
+        "debit": np.asarray(debits, dtype=np.float64),
+        "credit": np.asarray(credits, dtype=np.float64),
+        "balance": np.asarray(balances, dtype=np.float64),
+    }
+
+    # Statements are normally chronological already. If not, a stable
+    # argsort on the int64 dates orders them while keeping same-day rows in
+    # document order, so process_statement can skip its own sort.
+    if not columns["date"].is_monotonic_increasing:
+        order = np.argsort(columns["date"].asi8, kind="stable")
+        columns = {k: v[order] for k, v in columns.items()}
+
+    df = pd.DataFrame(columns)
+    if df["date"].isna().any():
+        df = df.dropna(subset=["date"], ignore_index=True)
+    df.attrs["sorted"] = True
     return df
 
 
@@ -190,6 +443,21 @@ _S_REF_END = 355
 _S_DEBIT_END = 425
 _S_CREDIT_END = 500
 
+_S_BOUNDS = np.array(
+    [_S_DESC_START, _S_DESC_END, _S_REF_END, _S_DEBIT_END, _S_CREDIT_END],
+    dtype=np.float64,
+)
+
+# Column ids as produced by np.searchsorted(_S_BOUNDS, x0, side="right")
+(
+    _S_COL_DATE,
+    _S_COL_DESC,
+    _S_COL_REF,
+    _S_COL_DEBIT,
+    _S_COL_CREDIT,
+    _S_COL_BALANCE,
+) = range(len(_S_BOUNDS) + 1)
+
 
 def _sbi_amt(text):
     try:
@@ -198,6 +466,15 @@ def _sbi_amt(text):
         return None
 
 
+def _sbi_last_amt(texts):
+    """Last parseable amount in a column's tokens, 0.0 if there is none."""
+    for t in reversed(texts):
+        v = _sbi_amt(t)
+        if v is not None:
+            return v
+    return 0.0
+
+
 def _sbi_is_txn_start(texts):
     return len(texts) >= 2 and texts[0].isdigit() and texts[1] in _SBI_MONTHS
 
@@ -230,14 +507,15 @@ def parse_sbi_pdf(file_stream, password=None):
         for page in pdf.pages:
             words = page.extract_words()
 
-            rows = {}
+            rows = defaultdict(list)
             for w in words:
-                rows.setdefault(round(w["top"], 0), []).append(w)
+                rows[round(w["top"], 0)].append(w)
 
             for _top, row_words in sorted(rows.items()):
                 row_words = sorted(row_words, key=lambda w: w["x0"])
                 texts = [w["text"] for w in row_words]
                 x0s = [w["x0"] for w in row_words]
+                cols = np.searchsorted(_S_BOUNDS, x0s, side="right").tolist()
 
                 # ── Skip headers ────────────────────────────────────────────
                 if _sbi_is_header(texts):
@@ -259,37 +537,22 @@ def parse_sbi_pdf(file_stream, password=None):
                     except (ValueError, IndexError):
                         continue
 
-                    desc = ref = ""
-                    debit = credit = balance = 0.0
-
-                    for i in range(desc_start, len(row_words)):
-                        x, t = row_words[i]["x0"], row_words[i]["text"]
-                        if x < _S_DESC_END:
-                            desc += t + " "
-                        elif x < _S_REF_END:
-                            ref += t + " "
-                        elif x < _S_DEBIT_END:
-                            v = _sbi_amt(t)
-                            if v is not None:
-                                debit = v
-                        elif x < _S_CREDIT_END:
-                            v = _sbi_amt(t)
-                            if v is not None:
-                                credit = v
-                        else:
-                            v = _sbi_amt(t)
-                            if v is not None:
-                                balance = v
+                    # Bucket every token after the dates by its column id
+                    fields = [[] for _ in range(len(_S_BOUNDS) + 1)]
+                    for t, c in zip(texts[desc_start:], cols[desc_start:]):
+                        fields[c].append(t)
 
                     transactions.append(
                         {
                             "date": txn_date,
-                            "narration": desc.strip(),
-                            "ref_no": ref.strip(),
+                            "narration": " ".join(
+                                fields[_S_COL_DATE] + fields[_S_COL_DESC]
+                            ),
+                            "ref_no": " ".join(fields[_S_COL_REF]),
                             "value_date": "",
-                            "debit": debit,
-                            "credit": credit,
-                            "balance": balance,
+                            "debit": _sbi_last_amt(fields[_S_COL_DEBIT]),
+                            "credit": _sbi_last_amt(fields[_S_COL_CREDIT]),
+                            "balance": _sbi_last_amt(fields[_S_COL_BALANCE]),
                         }
                     )
                     continue
@@ -299,16 +562,14 @@ def parse_sbi_pdf(file_stream, password=None):
                     continue
 
                 # If any word is in amount zone → not a continuation
-                if any(x >= _S_REF_END for x in x0s):
+                if max(cols) >= _S_COL_DEBIT:
                     continue
 
-                for w in row_words:
-                    x, t = w["x0"], w["text"]
-                    if x < _S_DESC_START:
-                        pass  # date zone year tokens → skip
-                    elif x < _S_DESC_END:
+                # Date zone year tokens (_S_COL_DATE) are skipped
+                for t, c in zip(texts, cols):
+                    if c == _S_COL_DESC:
                         transactions[-1]["narration"] += " " + t
-                    elif x < _S_REF_END:
+                    elif c == _S_COL_REF:
                         transactions[-1]["ref_no"] += " " + t
 
                 transactions[-1]["narration"] = transactions[-1]["narration"].strip()
@@ -357,6 +618,21 @@ _A_DEBIT_END = 396  # debit zone ends here (credit starts)
 _A_CREDIT_END = 497  # credit zone ends here (balance starts)
 _A_INITBR_START = 535  # Init.Br column – ignored
 
+_A_BOUNDS = np.array(
+    [_A_NARR_START, _A_NARR_END, _A_DEBIT_END, _A_CREDIT_END, _A_INITBR_START],
+    dtype=np.float64,
+)
+
+# Column ids as produced by np.searchsorted(_A_BOUNDS, x0, side="right")
+(
+    _A_COL_CHQ,
+    _A_COL_NARR,
+    _A_COL_DEBIT,
+    _A_COL_CREDIT,
+    _A_COL_BALANCE,
+    _A_COL_INITBR,
+) = range(len(_A_BOUNDS) + 1)
+
 # Rows containing only these texts are header/footer lines to skip
 _A_SKIP_TEXTS = {
     "Tran",
@@ -427,6 +703,15 @@ def _axis_amt(text):
         return None
 
 
+def _axis_last_amt(texts):
+    """Last parseable amount in a column's tokens, 0.0 if there is none."""
+    for t in reversed(texts):
+        v = _axis_amt(t)
+        if v is not None:
+            return v
+    return 0.0
+
+
 def _axis_is_skip_row(texts, x0s):
     """True for header, footer or total rows that should be ignored."""
     if not texts:
@@ -471,14 +756,15 @@ def parse_axis_pdf(file_stream, password=None):
             words = page.extract_words()
 
             # Group words into logical rows by y-position
-            rows = {}
+            rows = defaultdict(list)
             for w in words:
-                rows.setdefault(round(w["top"], 0), []).append(w)
+                rows[round(w["top"], 0)].append(w)
 
             for _top, row_words in sorted(rows.items()):
                 row_words = sorted(row_words, key=lambda w: w["x0"])
                 texts = [w["text"] for w in row_words]
                 x0s = [w["x0"] for w in row_words]
+                cols = np.searchsorted(_A_BOUNDS, x0s, side="right").tolist()
 
                 # ── Skip header / footer / total rows ────────────────────
                 if _axis_is_skip_row(texts, x0s):
@@ -496,29 +782,13 @@ def parse_axis_pdf(file_stream, password=None):
                         pending_narration = ""
                         continue
 
-                    narration_tail = ""
-                    debit = credit = balance = 0.0
-
-                    for w in row_words[1:]:  # skip date token
-                        x, t = w["x0"], w["text"]
-                        if x >= _A_INITBR_START:
-                            pass  # branch code – ignore
-                        elif x >= _A_CREDIT_END:
-                            v = _axis_amt(t)
-                            if v is not None:
-                                balance = v
-                        elif x >= _A_DEBIT_END:
-                            v = _axis_amt(t)
-                            if v is not None:
-                                credit = v
-                        elif x >= _A_NARR_END:
-                            v = _axis_amt(t)
-                            if v is not None:
-                                debit = v
-                        elif x >= _A_NARR_START:
-                            narration_tail += t + " "
-                        # x < _A_NARR_START → Chq No zone (skip)
+                    # Bucket tokens after the date by column id; the Chq No
+                    # and Init.Br (branch code) columns are never read
+                    fields = [[] for _ in range(len(_A_BOUNDS) + 1)]
+                    for t, c in zip(texts[1:], cols[1:]):
+                        fields[c].append(t)
 
+                    narration_tail = " ".join(fields[_A_COL_NARR])
                     full_narration = (pending_narration + " " + narration_tail).strip()
                     full_narration = " ".join(
                         full_narration.split()
@@ -528,9 +798,9 @@ def parse_axis_pdf(file_stream, password=None):
                         {
                             "date": txn_date,
                             "narration": full_narration,
-                            "debit": debit,
-                            "credit": credit,
-                            "balance": balance,
+                            "debit": _axis_last_amt(fields[_A_COL_DEBIT]),
+                            "credit": _axis_last_amt(fields[_A_COL_CREDIT]),
+                            "balance": _axis_last_amt(fields[_A_COL_BALANCE]),
                         }
                     )
                     pending_narration = ""  # reset after consuming
@@ -538,9 +808,8 @@ def parse_axis_pdf(file_stream, password=None):
 
                 # ── Narration-prefix row (no date, no amounts) ───────────
                 # Accumulate text from the narration zone into the buffer
-                for w in row_words:
-                    x, t = w["x0"], w["text"]
-                    if _A_NARR_START <= x < _A_NARR_END:
+                for t, c in zip(texts, cols):
+                    if c == _A_COL_NARR:
                         pending_narration += t + " "
 
     import pandas as pd
@@ -0,0 +1,67 @@
+from app.parser import _hdfc_header_shift, _hdfc_rows
+
+# x0 of each column's first word on the verified HDFC layout
+_DATE, _NARR, _REF, _VALDT, _WDL, _BAL = 33, 72, 285, 360, 420, 570
+
+_HEADER = [
+    "Date",
+    "Narration",
+    "Chq./Ref.No.",
+    "ValueDt",
+    "WithdrawalAmt.",
+    "ClosingBalance",
+]
+_ROW = ["01/04/24", "UPI-PAYMENT", "123456789012", "01/04/24", "500.00", "9,500.00"]
+
+
+def _page(header_x0s, row_x0s, n_rows=3):
+    """Words (texts, x0s, tops) of a page: one header row, n_rows transactions."""
+    texts, x0s, tops = list(_HEADER), list(header_x0s), [100.0] * len(_HEADER)
+    for i in range(n_rows):
+        texts += _ROW
+        x0s += row_x0s
+        tops += [120.0 + 10 * i] * len(_ROW)
+    return texts, x0s, tops
+
+
+def _verified(dx=0):
+    return [x + dx for x in (_DATE, _NARR, _REF, _VALDT, _WDL, _BAL)]
+
+
+def test_header_shift_verified_layout():
+    assert _hdfc_header_shift(*_page(_verified(), _verified())) == 0.0
+
+
+def test_header_shift_whole_table_moved():
+    assert _hdfc_header_shift(*_page(_verified(20), _verified(20))) == 20.0
+
+
+def test_header_shift_ignored_when_only_date_column_moved():
+    # "Date" header and dates at x0 = 40, every other column where it was:
+    # shifting all boundaries by 7 would push ref no. into the narration
+    moved = [40] + _verified()[1:]
+    words = _page(moved, moved)
+    assert _hdfc_header_shift(*words) == 0.0
+
+    row = list(_hdfc_rows(*words))[1]
+    assert row[0][2] == "123456789012"
+    assert row[2] == [0, 1, 2, 3, 4, 6]
+
+
+def test_header_shift_ignored_when_header_date_left_of_dates():
+    # "Date" header at x0 = 25, every column where it was: the dates still
+    # fit a -8 shift, but amounts near a boundary would change column
+    header = [25] + _verified()[1:]
+    withdrawal = _verified()[:4] + [485, _BAL]
+    deposit = _verified()[:4] + [553, _BAL]
+
+    for amount_x0s, amount_col in ((withdrawal, 4), (deposit, 5)):
+        words = _page(header, amount_x0s)
+        assert _hdfc_header_shift(*words) == 0.0
+
+        row = list(_hdfc_rows(*words))[1]
+        assert row[2] == [0, 1, 2, 3, amount_col, 6]
+
+
+def test_header_shift_needs_date_tokens():
+    assert _hdfc_header_shift(*_page(_verified(20), [], n_rows=0)) is None